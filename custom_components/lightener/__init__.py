@@ -5,10 +5,9 @@ from types import MappingProxyType
 import logging
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_ADDRESS, CONF_PORT, Platform
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 
-from .const import DOMAIN
 from .config_flow import LightenerConfigFlow
 
 _LOGGER = logging.getLogger(__name__)
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 import math
-from collections import OrderedDict
+from functools import lru_cache
 from types import MappingProxyType
 from typing import Any
 
@@ -58,6 +58,84 @@ def _convert_percent_to_brightness(percent: int) -> int:
     return math.ceil(255 * percent / 100)
 
 
+# Maps brightness 0 to 0 (off) and any other brightness to 255 (on).
+_ON_OFF_TRANSLATION = bytes([0] + [255] * 255)
+
+
+# The tables are cached and shared between lights with the same configuration, so they're all immutable.
+@lru_cache(maxsize=128)
+def _calculate_levels(
+    config_levels: tuple[tuple[int, int], ...]
+) -> tuple[bytes, tuple[tuple[int, ...], ...], bytes, tuple[tuple[int, ...], ...]]:
+    """Calculate the level tables for the sorted (lightener level, light level) pairs."""
+
+    # Start the level list with value 0 for level 0.
+    levels = [0]
+
+    # List with all possible Lightener levels for a given entity level.
+    # Initializa it with a list from 0 to 255 having each entry an empty array.
+    to_lightener_levels = [[] for i in range(0,256)]
+    to_lightener_levels_on_off = [[] for i in range(0,256)]
+
+    previous_lightener_level = 0
+    previous_light_level = 0
+
+    # Fill all levels with the calculated values between the ranges.
+    for lightener_level, light_level in config_levels:
+
+        # Calculate all possible levels between the configured ranges
+        # to be used during translation (lightener -> entity)
+        for i in range(previous_lightener_level + 1, lightener_level):
+            value_at_current_level = math.ceil(
+                previous_light_level
+                + (light_level - previous_light_level)
+                * (i - previous_lightener_level)
+                / (lightener_level - previous_lightener_level)
+            )
+            levels.append(value_at_current_level)
+            to_lightener_levels[value_at_current_level].append(i)
+
+            # On/Off entities have only two possible levels: 0 (off) and 255 (on).
+            to_lightener_levels_on_off[255 if value_at_current_level > 0 else 0].append(i)
+
+        # To account for rounding, we use the configured values directly.
+        levels.append(light_level)
+        to_lightener_levels[light_level].append(lightener_level)
+
+        to_lightener_levels_on_off[255 if light_level > 0 else 0].append(lightener_level)
+
+        # Do the reverse calculation for the oposite translation direction (entity -> lightener)
+        for i in range(previous_light_level, light_level, 1 if previous_light_level < light_level else -1):
+            value_at_current_level = math.ceil(
+                previous_lightener_level
+                + (lightener_level - previous_lightener_level)
+                * (i - previous_light_level)
+                / (light_level - previous_light_level)
+            )
+
+            # Since the same entity level can happen more than once (e.g. "50:100, 100:0") we
+            # create a list with all possible lightener levels at this (i) entity brightness.
+            if value_at_current_level not in to_lightener_levels[i]:
+                to_lightener_levels[i].append(value_at_current_level)
+                to_lightener_levels_on_off[255 if value_at_current_level > 0 else 0].append(value_at_current_level)
+
+        previous_lightener_level = lightener_level
+        previous_light_level = light_level
+
+    levels = bytes(levels)
+
+    # The On/Off levels are the dimmable ones with anything above 0 mapped to 255, which bytes.translate()
+    # does in a single pass.
+    levels_on_off = levels.translate(_ON_OFF_TRANSLATION)
+
+    return (
+        levels,
+        tuple(map(tuple, to_lightener_levels)),
+        levels_on_off,
+        tuple(map(tuple, to_lightener_levels_on_off)),
+    )
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -265,68 +343,12 @@ class LightenerControlledLight:
 
         config_levels.setdefault(255, 255)
 
-        config_levels = OrderedDict(sorted(config_levels.items()))
-
-        # Start the level list with value 0 for level 0.
-        levels = [0]
-        levels_on_off = [0]
-
-        # List with all possible Lightener levels for a given entity level.
-        # Initializa it with a list from 0 to 255 having each entry an empty array.
-        to_lightener_levels = [[] for i in range(0,256)]
-        to_lightener_levels_on_off = [[] for i in range(0,256)]
-
-        previous_lightener_level = 0
-        previous_light_level = 0
-
-        # Fill all levels with the calculated values between the ranges.
-        for lightener_level, light_level in config_levels.items():
-
-            # Calculate all possible levels between the configured ranges
-            # to be used during translation (lightener -> entity)
-            for i in range(previous_lightener_level + 1, lightener_level):
-                value_at_current_level = math.ceil(
-                    previous_light_level
-                    + (light_level - previous_light_level)
-                    * (i - previous_lightener_level)
-                    / (lightener_level - previous_lightener_level)
-                )
-                levels.append(value_at_current_level)
-                to_lightener_levels[value_at_current_level].append(i)
-
-                # On/Off entities have only two possible levels: 0 (off) and 255 (on).
-                levels_on_off.append(255 if value_at_current_level > 0 else 0)
-                to_lightener_levels_on_off[255 if value_at_current_level > 0 else 0].append(i)
-
-            # To account for rounding, we use the configured values directly.
-            levels.append(light_level)
-            to_lightener_levels[light_level].append(lightener_level)
-
-            levels_on_off.append(255 if light_level > 0 else 0)
-            to_lightener_levels_on_off[255 if light_level > 0 else 0].append(lightener_level)
-
-            # Do the reverse calculation for the oposite translation direction (entity -> lightener)
-            for i in range(previous_light_level, light_level, 1 if previous_light_level < light_level else -1):
-                value_at_current_level = math.ceil(
-                    previous_lightener_level
-                    + (lightener_level - previous_lightener_level)
-                    * (i - previous_light_level)
-                    / (light_level - previous_light_level)
-                )
-
-                # Since the same entity level can happen more than once (e.g. "50:100, 100:0") we
-                # create a list with all possible lightener levels at this (i) entity brightness.
-                if value_at_current_level not in to_lightener_levels[i]:
-                    to_lightener_levels[i].append(value_at_current_level)
-                    to_lightener_levels_on_off[255 if value_at_current_level > 0 else 0].append(value_at_current_level)
-
-            previous_lightener_level = lightener_level
-            previous_light_level = light_level
-
-        self.levels = levels
-        self.to_lightener_levels = to_lightener_levels
-        self.levels_on_off = levels_on_off
-        self.to_lightener_levels_on_off = to_lightener_levels_on_off
+        (
+            self.levels,
+            self.to_lightener_levels,
+            self.levels_on_off,
+            self.to_lightener_levels_on_off,
+        ) = _calculate_levels(tuple(sorted(config_levels.items())))
 
     @property
     def type(self) -> TYPE_ONOFF | TYPE_DIMMABLE | None:
@@ -352,11 +374,11 @@ class LightenerControlledLight:
 
         return self.levels[int(brightness)]
 
-    def translate_brightness_back(self, brightness: int) -> list[int]:
+    def translate_brightness_back(self, brightness: int) -> tuple[int, ...]:
         """Calculates all possible Lightener brightness levels for a give entity brightness."""
 
         if brightness is None:
-            return []
+            return ()
 
         if self.type == TYPE_ONOFF:
             return self.to_lightener_levels_on_off[int(brightness)]
@@ -0,0 +1,18 @@
+"""Common helpers for testing."""
+
+from collections.abc import Mapping, Sequence
+
+
+def assert_levels_equal(levels: Sequence, expected: Mapping[int, int | tuple[int, ...]]) -> None:
+    """Check the levels at all indexes in expected with a single comparison"""
+
+    # Not a test module, so pytest doesn't rewrite anything here. The message lists only the levels that differ.
+    actual = {index: levels[index] for index in expected}
+
+    if actual != expected:
+        differences = {
+            index: (actual[index], value)
+            for index, value in expected.items()
+            if actual[index] != value
+        }
+        raise AssertionError(f"Levels differ at (index: (actual, expected)): {differences}")
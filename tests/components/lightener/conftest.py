@@ -1,52 +1,96 @@
 """Fixtures for testing."""
 
 from typing import Callable
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
 
 import pytest
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity_platform import async_get_platforms
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, State
 from homeassistant.components.light import ColorMode
 
-from pytest_homeassistant_custom_component.common import MockConfigEntry
-
+from custom_components.lightener import async_migrate_entry
+from custom_components.lightener.const import DOMAIN
 from custom_components.lightener.light import LightenerLight
 
 
+# The autouse fixtures below only request hass for tests that already use it, so tests that don't
+# need Home Assistant don't pay for its setup.
+
 @pytest.fixture(autouse=True)
-def auto_enable_custom_integrations(enable_custom_integrations):
+def auto_enable_custom_integrations(request: pytest.FixtureRequest):
+    """Enable custom integrations in tests using hass"""
+
+    if "hass" in request.fixturenames:
+        request.getfixturevalue("enable_custom_integrations")
+
     yield
 
 @pytest.fixture(autouse=True)
-async def register_test_lights(hass: HomeAssistant):
+def register_test_lights(request: pytest.FixtureRequest):
     """Register test lights used in tests"""
 
+    if "hass" not in request.fixturenames:
+        return
+
+    hass: HomeAssistant = request.getfixturevalue("hass")
+
     hass.states.async_set(entity_id="light.test1", new_state="off", attributes={"supported_color_modes": [ColorMode.BRIGHTNESS]})
     hass.states.async_set(entity_id="light.test2", new_state="off", attributes={"supported_color_modes": [ColorMode.BRIGHTNESS]})
     hass.states.async_set(entity_id="light.test_onoff", new_state="off", attributes={"supported_color_modes": [ColorMode.ONOFF]})
 
+@pytest.fixture(scope="module")
+def hass_mock() -> MagicMock:
+    """A mocked HomeAssistant instance for tests that only need something to pass as hass
+
+    It's module-scoped so module-scoped fixtures can use it too. Tests must not assert on its calls.
+    """
+
+    return MagicMock(spec=HomeAssistant)
+
+@pytest.fixture
+def service_call_mock(hass: HomeAssistant) -> AsyncMock:
+    """Replaces hass.services.async_call with a mock for the duration of the test"""
+
+    with patch.object(hass.services, "async_call") as mock:
+        yield mock
+
+@pytest.fixture
+def fake_states(hass: HomeAssistant) -> dict[str, State]:
+    """Serves hass.states.get from a plain dict, so states are set without going through the event bus"""
+
+    states: dict[str, State] = {}
+
+    with patch.object(hass.states, "get", lambda entity_id: states.get(entity_id.lower())):
+        yield states
+
 @pytest.fixture
 async def create_lightener(hass: HomeAssistant) -> Callable[[str, dict], LightenerLight]:
     """Creates a function used to create Lightners"""
 
-    async def creator(name: str | None = None, config: dict | None = None) -> str:
-        entry = MockConfigEntry(
-            domain="lightener",
-            unique_id=str(uuid4()),
-            data={
+    async def creator(name: str | None = None, config: dict | None = None) -> LightenerLight:
+        # The tests only exercise the light itself, so the config is migrated and the light is built
+        # the same way async_setup_platform does, without setting up a config entry
+        # (test_async_setup_entry covers that path).
+        entry = ConfigEntry(
+            1,
+            DOMAIN,
+            "",
+            {
                 "friendly_name": name or "Test",
                 "entities": {
                     "light.test1": {}
                 },
             } if config is None else config,
+            "user",
         )
-        entry.add_to_hass(hass)
 
-        assert await hass.config_entries.async_setup(entry.entry_id)
-        await hass.async_block_till_done()
+        await async_migrate_entry(hass, entry, False)
+
+        lightener = LightenerLight(hass, entry.data, str(uuid4()))
+        lightener.hass = hass
 
-        platform = async_get_platforms(hass, "lightener")
-        return platform[0].entities["light.test"]
+        return lightener
 
     return creator
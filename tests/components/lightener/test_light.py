@@ -1,7 +1,9 @@
 """Tests for the light platform"""
 
-from unittest.mock import ANY, Mock, patch
-from uuid import uuid4
+import json
+from itertools import count
+from pathlib import Path
+from unittest.mock import ANY, Mock
 
 import pytest
 from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_TRANSITION
@@ -9,25 +11,33 @@ from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
 from homeassistant.components.light import ColorMode
 from homeassistant.const import (ATTR_ENTITY_ID, SERVICE_TURN_OFF,
                                  SERVICE_TURN_ON)
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers.entity_platform import async_get_platforms
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 from custom_components.lightener.const import TYPE_DIMMABLE, TYPE_ONOFF
 from custom_components.lightener.light import (LightenerControlledLight,
                                                LightenerLight,
                                                _convert_percent_to_brightness,
                                                async_setup_platform)
+from tests.components.lightener.common import assert_levels_equal
+
+_ids = count()
+
+# Snapshots ("golden" files) of full level tables, compared as a whole with the calculated ones.
+GOLDEN_PATH = Path(__file__).parent / "golden"
 
 ###########################################################
 ### LightenerLight class only tests
 
 
-async def test_lightener_light_properties(hass):
+def test_lightener_light_properties(hass_mock):
     """Test all the basic properties of the LightenerLight class"""
 
     config = {"friendly_name": "Living Room"}
-    unique_id = str(uuid4())
+    unique_id = f"uid-{next(_ids)}"
 
-    lightener = LightenerLight(hass, config, unique_id)
+    lightener = LightenerLight(hass_mock, config, unique_id)
 
     assert lightener.unique_id == unique_id
 
@@ -41,19 +51,19 @@ async def test_lightener_light_properties(hass):
     assert lightener.icon == "mdi:lightbulb-group"
 
 
-async def test_lightener_light_properties_no_unique_id(hass):
+def test_lightener_light_properties_no_unique_id(hass_mock):
     """Test all the basic properties of the LightenerLight class when no unique id is provided"""
 
     config = {"friendly_name": "Living Room"}
 
-    lightener = LightenerLight(hass, config)
+    lightener = LightenerLight(hass_mock, config)
 
     assert lightener.unique_id is None
     assert lightener.device_info is None
     assert lightener.name == "Living Room"
 
 
-async def test_lightener_light_turn_on(hass: HomeAssistant, create_lightener):
+async def test_lightener_light_turn_on(hass: HomeAssistant, create_lightener, service_call_mock):
     """Test the state changes of the LightenerLight class when turned on"""
 
     lightener: LightenerLight = await create_lightener(config={
@@ -65,12 +75,11 @@ async def test_lightener_light_turn_on(hass: HomeAssistant, create_lightener):
         }
     )
 
-    with patch.object(hass.services, "async_call") as async_call_mock:
-        await lightener.async_turn_on()
+    await lightener.async_turn_on()
 
-    assert async_call_mock.call_count == 2
+    assert service_call_mock.call_count == 2
 
-    async_call_mock.assert_any_call(
+    service_call_mock.assert_any_call(
         LIGHT_DOMAIN,
         SERVICE_TURN_ON,
         {ATTR_ENTITY_ID: "light.test1"},
@@ -78,7 +87,7 @@ async def test_lightener_light_turn_on(hass: HomeAssistant, create_lightener):
         context=ANY,
     )
 
-    async_call_mock.assert_any_call(
+    service_call_mock.assert_any_call(
         LIGHT_DOMAIN,
         SERVICE_TURN_ON,
         {ATTR_ENTITY_ID: "light.test2"},
@@ -86,19 +95,18 @@ async def test_lightener_light_turn_on(hass: HomeAssistant, create_lightener):
         context=ANY,
     )
 
-async def test_lightener_light_turn_on_forward(hass: HomeAssistant, create_lightener):
+async def test_lightener_light_turn_on_forward(hass: HomeAssistant, create_lightener, service_call_mock):
     """Test if passed arguments are forwared when turned on"""
 
     lightener: LightenerLight = await create_lightener()
 
-    with patch.object(hass.services, "async_call") as async_call_mock:
-        await lightener.async_turn_on(
-            brightness=50,
-            effect="blink",
-            color_temp_kelvin=3000
-        )
+    await lightener.async_turn_on(
+        brightness=50,
+        effect="blink",
+        color_temp_kelvin=3000
+    )
 
-    async_call_mock.assert_called_once_with(
+    service_call_mock.assert_called_once_with(
         LIGHT_DOMAIN,
         SERVICE_TURN_ON,
         {
@@ -111,7 +119,7 @@ async def test_lightener_light_turn_on_forward(hass: HomeAssistant, create_light
         context=ANY,
     )
 
-async def test_lightener_light_turn_on_go_off_if_brightness_0(hass: HomeAssistant, create_lightener):
+async def test_lightener_light_turn_on_go_off_if_brightness_0(hass: HomeAssistant, create_lightener, service_call_mock):
     """Test that turned on sends brightness 0 if the controlled light is on"""
 
     lightener: LightenerLight = await create_lightener(config={
@@ -125,10 +133,9 @@ async def test_lightener_light_turn_on_go_off_if_brightness_0(hass: HomeAssistan
 
     hass.states.async_set(entity_id="light.test1", new_state="on")
 
-    with patch.object(hass.services, "async_call") as async_call_mock:
-        await lightener.async_turn_on(brightness=1)
+    await lightener.async_turn_on(brightness=1)
 
-    async_call_mock.assert_called_once_with(
+    service_call_mock.assert_called_once_with(
         LIGHT_DOMAIN,
         SERVICE_TURN_OFF,
         {
@@ -139,7 +146,7 @@ async def test_lightener_light_turn_on_go_off_if_brightness_0(hass: HomeAssistan
     )
 
 
-async def test_lightener_light_turn_on_translate_brightness(hass: HomeAssistant, create_lightener):
+async def test_lightener_light_turn_on_translate_brightness(hass: HomeAssistant, create_lightener, service_call_mock):
     """Test that turned on sends brightness 0 if the controlled light is on"""
 
     lightener: LightenerLight = await create_lightener(config={
@@ -153,10 +160,9 @@ async def test_lightener_light_turn_on_translate_brightness(hass: HomeAssistant,
 
     hass.states.async_set(entity_id="light.test1", new_state="on")
 
-    with patch.object(hass.services, "async_call") as async_call_mock:
-        await lightener.async_turn_on(brightness=192)
+    await lightener.async_turn_on(brightness=192)
 
-    async_call_mock.assert_called_once_with(
+    service_call_mock.assert_called_once_with(
         LIGHT_DOMAIN,
         SERVICE_TURN_ON,
         {
@@ -167,7 +173,7 @@ async def test_lightener_light_turn_on_translate_brightness(hass: HomeAssistant,
         context=ANY,
     )
 
-async def test_lightener_light_turn_on_go_off_if_brightness_0_transition(hass: HomeAssistant, create_lightener):
+async def test_lightener_light_turn_on_go_off_if_brightness_0_transition(hass: HomeAssistant, create_lightener, service_call_mock):
     """Test that turned on sends brightness 0 if the controlled light is on"""
 
     lightener: LightenerLight = await create_lightener(config={
@@ -181,10 +187,9 @@ async def test_lightener_light_turn_on_go_off_if_brightness_0_transition(hass: H
 
     hass.states.async_set(entity_id="light.test1", new_state="on")
 
-    with patch.object(hass.services, "async_call") as async_call_mock:
-        await lightener.async_turn_on(brightness=1, transition=10)
+    await lightener.async_turn_on(brightness=1, transition=10)
 
-    async_call_mock.assert_called_once_with(
+    service_call_mock.assert_called_once_with(
         LIGHT_DOMAIN,
         SERVICE_TURN_OFF,
         {
@@ -195,8 +200,8 @@ async def test_lightener_light_turn_on_go_off_if_brightness_0_transition(hass: H
         context=ANY,
     )
 
-async def test_lightener_light_async_update_group_state(hass: HomeAssistant, create_lightener):
-    """Test that turned on does nothing if the controlled light is already off"""
+async def test_lightener_light_async_update_group_state(create_lightener, fake_states):
+    """Test the state of the LightenerLight class along changes of the controlled light state"""
 
     lightener: LightenerLight = await create_lightener(config={
         "friendly_name": "Test",
@@ -209,10 +214,7 @@ async def test_lightener_light_async_update_group_state(hass: HomeAssistant, cre
 
     lightener._attr_brightness = 150    # pylint: disable=protected-access
 
-    hass.states.async_set(entity_id="light.test1", new_state="on",
-        attributes={
-            'color_temp_kelvin': 3000
-        })
+    fake_states["light.test1"] = State("light.test1", "on", {'color_temp_kelvin': 3000})
 
     lightener.async_update_group_state()
 
@@ -221,142 +223,78 @@ async def test_lightener_light_async_update_group_state(hass: HomeAssistant, cre
 
     assert lightener.brightness == 255
 
-    hass.states.async_set(entity_id="light.test1", new_state="on",
-        attributes={
-            'brightness': 255
-        })
+    fake_states["light.test1"] = State("light.test1", "on", {'brightness': 255})
 
     lightener.async_update_group_state()
 
     assert lightener.brightness == 255
 
-    hass.states.async_set(entity_id="light.test1", new_state="on",
-        attributes={
-            'brightness': 1
-        })
+    fake_states["light.test1"] = State("light.test1", "on", {'brightness': 1})
 
     lightener.async_update_group_state()
 
     assert lightener.brightness == 129
 
-    hass.states.async_set(entity_id="light.test1", new_state="on",
-        attributes={
-            'brightness': 0
-        })
+    fake_states["light.test1"] = State("light.test1", "on", {'brightness': 0})
 
     lightener.async_update_group_state()
 
     assert lightener.is_on is True
     assert lightener.brightness == 1
 
-async def test_lightener_light_async_update_group_state_zero(hass: HomeAssistant, create_lightener):
-    """Test that turned on does nothing if the controlled light is already off"""
-
-    lightener: LightenerLight = await create_lightener(config={
-        "friendly_name": "Test",
-        "entities": {
-            "light.test1": {}
-        },
-    })
-
-    lightener._attr_brightness = 150    # pylint: disable=protected-access
-
-    hass.states.async_set(entity_id="light.test1", new_state="on",
-        attributes={
-            'brightness': 0
-        })
+# Controlled lights configurations shared by the async_update_group_state brightness cases.
 
-    lightener.async_update_group_state()
+# Two lights: "light.test1" off up to 50% and "light.test2" full on from 10%.
+TWO_LIGHTS_ENTITIES = {"light.test1": {"50": "0"}, "light.test2": {"10": "100"}}
 
-    assert lightener.brightness == 0
+# A single light going from off at 50% to full on at 60%.
+RANGE_ENTITIES = {"light.test1": {"50": "0", "60": "100"}}
 
-async def test_lightener_light_async_update_group_state_unavailable(hass: HomeAssistant, create_lightener):
-    """Test that turned on does nothing if the controlled light is already off"""
+@pytest.mark.parametrize("entities, current, states, result", [
+    # Brightness 0 on a light that is on.
+    ({"light.test1": {}}, 150, {"light.test1": 0}, 0),
 
-    lightener: LightenerLight = await create_lightener(config={
-        "friendly_name": "Test",
-        "entities": {
-            "light.test1": {"50": "0"},
-            "light.I_DONT_EXIST": {}
-        },
-    })
-
-    lightener._attr_brightness = 150    # pylint: disable=protected-access
-
-    hass.states.async_set(entity_id="light.test1", new_state="on",
-        attributes={
-            'brightness': 1
-        })
-
-    lightener.async_update_group_state()
-
-    assert lightener.brightness == 129
-
-async def test_lightener_light_async_update_group_state_no_match_no_change(hass: HomeAssistant, create_lightener):
-    """Test that turned on does nothing if the controlled light is already off"""
-
-    lightener: LightenerLight = await create_lightener(config={
-        "friendly_name": "Test",
-        "entities": {
-            "light.test1": {"50": "0"},
-            "light.test2": {"10": "100"}
-        },
-    })
-
-    def test(test1: int, test2: int, result: int):
-        lightener._attr_brightness = 150    # pylint: disable=protected-access
-
-        hass.states.async_set(entity_id="light.test1", new_state="on",
-            attributes={'brightness': test1})
-
-        hass.states.async_set(entity_id="light.test2", new_state="on",
-            attributes={'brightness': test2})
-
-        lightener.async_update_group_state()
-
-        assert lightener.brightness == result
+    # Unavailable lights are ignored.
+    ({"light.test1": {"50": "0"}, "light.I_DONT_EXIST": {}}, 150, {"light.test1": 1}, 129),
 
     # Matches
-    test(0, 26, 3)
-    test(1, 255, 129)
+    (TWO_LIGHTS_ENTITIES, 150, {"light.test1": 0, "light.test2": 26}, 3),
+    (TWO_LIGHTS_ENTITIES, 150, {"light.test1": 1, "light.test2": 255}, 129),
 
-    # No matches
-    test(129, 1, 150)
-    test(1, 254, 150)
-    test(1, 1, 150)
-    test(1, None, 150)
+    # No matches, so no change.
+    (TWO_LIGHTS_ENTITIES, 150, {"light.test1": 129, "light.test2": 1}, 150),
+    (TWO_LIGHTS_ENTITIES, 150, {"light.test1": 1, "light.test2": 254}, 150),
+    (TWO_LIGHTS_ENTITIES, 150, {"light.test1": 1, "light.test2": 1}, 150),
+    (TWO_LIGHTS_ENTITIES, 150, {"light.test1": 1, "light.test2": None}, 150),
 
-@pytest.mark.parametrize("test1, current, result", [
-    (0, 10, 10),
-    (0, 20, 20),
+    # The current level is a possible level, so no change.
+    (RANGE_ENTITIES, 10, {"light.test1": 0}, 10),
+    (RANGE_ENTITIES, 20, {"light.test1": 0}, 20),
+    (RANGE_ENTITIES, 200, {"light.test1": 255}, 200),
+    (RANGE_ENTITIES, 255, {"light.test1": 255}, 255),
 
     # We're in the range, so the change must happen here.
-    (128, 20, 141),
-
-    (255, 200, 200),
-    (255, 255, 255)
+    (RANGE_ENTITIES, 20, {"light.test1": 128}, 141),
 ])
-async def test_lightener_light_async_update_group_state_current_good_no_change(test1, current, result, hass: HomeAssistant, create_lightener):
-    """Test that turned on does nothing if the controlled light is already off"""
+async def test_lightener_light_async_update_group_state_brightness(entities, current, states, result, create_lightener, fake_states):
+    """Test the brightness calculated out of the controlled lights states"""
 
     lightener: LightenerLight = await create_lightener(config={
         "friendly_name": "Test",
-        "entities": {
-            "light.test1": {"50": "0", "60": "100"}
-        },
+        "entities": entities,
     })
 
     lightener._attr_brightness = current    # pylint: disable=protected-access
 
-    hass.states.async_set(entity_id="light.test1", new_state="on",
-        attributes={'brightness': test1})
+    for entity_id, brightness in states.items():
+        fake_states[entity_id] = State(entity_id, "on", {'brightness': brightness})
 
     lightener.async_update_group_state()
 
     assert lightener.brightness == result
 
 async def test_lightener_light_async_update_group_state_onoff(hass: HomeAssistant, create_lightener):
-    """Test that turned on does nothing if the controlled light is already off"""
+    """Test that brightness is supported even if all controlled lights are on/off only"""
 
     lightener: LightenerLight = await create_lightener(config={
         "friendly_name": "Test",
@@ -380,37 +318,34 @@ async def test_lightener_light_async_update_group_state_onoff(hass: HomeAssistan
 ###########################################################
 ### LightenerControlledLight class only tests
 
-async def test_lightener_light_entity_properties(hass):
+def test_lightener_light_entity_properties(hass_mock):
     """Test all the basic properties of the LightenerLight class"""
 
     light = LightenerControlledLight(
-        "light.test1", {"brightness": {"10": "20"}}, hass
+        "light.test1", {"brightness": {"10": "20"}}, hass_mock
     )
 
     assert light.entity_id == "light.test1"
 
-async def test_lightener_light_entity_calculated_levels(hass):
-    """Test the calculation of brigthness levels"""
+@pytest.fixture(scope="module")
+def light_10_100(hass_mock) -> LightenerControlledLight:
+    """Controlled light configured with 10:100 (the level tables are read-only, so it's shared)"""
 
-    light = LightenerControlledLight(
+    return LightenerControlledLight(
         "light.test1",
         {
             "brightness": {
-                "10": "100",
+                "10": "100", # 26: 255
             }
         },
-        hass,
+        hass_mock,
     )
 
-    assert light.levels[0] == 0
-    assert light.levels[13] == 128
-    assert light.levels[25] == 246
-    assert light.levels[26] == 255
-    assert light.levels[27] == 255
-    assert light.levels[100] == 255
-    assert light.levels[255] == 255
+@pytest.fixture(scope="module")
+def light_unsorted_levels(hass_mock) -> LightenerControlledLight:
+    """Controlled light configured with unsorted levels (the level tables are read-only, so it's shared)"""
 
-    light = LightenerControlledLight(
+    return LightenerControlledLight(
         "light.test1",
         {
             "brightness": {
@@ -419,61 +354,43 @@ async def test_lightener_light_entity_calculated_levels(hass):
                 "50": "100",
             }
         },
-        hass,
+        hass_mock,
     )
 
-    assert light.levels[0] == 0
-    assert light.levels[15] == 15
-    assert light.levels[26] == 26
-    assert light.levels[27] == 29
-    assert light.levels[128] == 255
-    assert light.levels[129] == 253
-    assert light.levels[255] == 0
-
-async def test_lightener_light_entity_calculated_to_lightner_levels(hass):
+def test_lightener_light_entity_calculated_levels(light_10_100, light_unsorted_levels):
     """Test the calculation of brigthness levels"""
 
-    light = LightenerControlledLight(
-        "light.test1",
-        {
-            "brightness": {
-                "10": "100" # 26: 255
-            }
-        },
-        hass,
-    )
+    light = light_10_100
 
-    assert light.to_lightener_levels[0] == [0]
-    assert light.to_lightener_levels[26] == [3]
-    assert light.to_lightener_levels[253] == [26]
-    assert light.to_lightener_levels[254] == [26]
-    assert light.to_lightener_levels[255] == list(range(26,256))
+    assert_levels_equal(light.levels, {0: 0, 13: 128, 25: 246, 26: 255, 27: 255, 100: 255, 255: 255})
 
+    light = light_unsorted_levels
 
-    light = LightenerControlledLight(
-        "light.test1",
-        {
-            "brightness": {
-                "100": "0",  # Test the ordering
-                "10": "10",
-                "50": "100",
-            }
-        },
-        hass,
-    )
+    assert_levels_equal(light.levels, {0: 0, 15: 15, 26: 26, 27: 29, 128: 255, 129: 253, 255: 0})
+
+def test_lightener_light_entity_calculated_to_lightner_levels(light_10_100, light_unsorted_levels):
+    """Test the calculation of brigthness levels"""
+
+    light = light_10_100
 
-    assert light.to_lightener_levels[0] == [0,255]
-    assert light.to_lightener_levels[26] == [26,243]
-    assert light.to_lightener_levels[255] == [128]
+    with open(GOLDEN_PATH / "to_lightener_levels_10_100.json", encoding="utf-8") as file:
+        assert light.to_lightener_levels == tuple(map(tuple, json.load(file)))
 
-    assert light.to_lightener_levels[3] == [3,254]
-    assert light.to_lightener_levels[10] == [10, 251]
+    light = light_unsorted_levels
+
+    assert_levels_equal(light.to_lightener_levels, {
+        0: (0,255),
+        3: (3,254),
+        10: (10,251),
+        26: (26,243),
+        255: (128,),
+    })
 
 @pytest.mark.parametrize("entity_id, expected_type", [
     ("light.test1", TYPE_DIMMABLE),
     ("light.test_onoff", TYPE_ONOFF),
 ])
-async def test_lightener_light_entity_type(entity_id, expected_type, hass):
+def test_lightener_light_entity_type(entity_id, expected_type, hass):
     """Test translate_brightness_back with float values"""
 
     light = LightenerControlledLight(
@@ -491,7 +408,7 @@ async def test_lightener_light_entity_type(entity_id, expected_type, hass):
     (39,123),
     (255,0),
 ])
-async def test_lightener_light_entity_translate_brightness_dimmable(lightener_level, light_level, hass):
+def test_lightener_light_entity_translate_brightness_dimmable(lightener_level, light_level, hass):
     """Test translate_brightness_back with float values"""
 
     light = LightenerControlledLight(
@@ -515,7 +432,7 @@ async def test_lightener_light_entity_translate_brightness_dimmable(lightener_le
     (39,255),
     (255,0),
 ])
-async def test_lightener_light_entity_translate_brightness_dimmable_onoff(lightener_level, light_level, hass):
+def test_lightener_light_entity_translate_brightness_dimmable_onoff(lightener_level, light_level, hass):
     """Test translate_brightness_back with float values"""
 
     light = LightenerControlledLight(
@@ -532,7 +449,7 @@ async def test_lightener_light_entity_translate_brightness_dimmable_onoff(lighte
 
     assert light.translate_brightness(lightener_level) == light_level
 
-async def test_lightener_light_entity_translate_brightness_float(hass):
+def test_lightener_light_entity_translate_brightness_float(hass):
     """Test translate_brightness_back with float values"""
 
     light = LightenerControlledLight(
@@ -547,7 +464,7 @@ async def test_lightener_light_entity_translate_brightness_float(hass):
 
     assert light.translate_brightness(2.9) == 20
 
-async def test_lightener_light_entity_translate_brightness_back_float(hass):
+def test_lightener_light_entity_translate_brightness_back_float(hass):
     """Test translate_brightness_back with float values"""
 
     light = LightenerControlledLight(
@@ -560,7 +477,7 @@ async def test_lightener_light_entity_translate_brightness_back_float(hass):
         hass,
     )
 
-    assert light.translate_brightness_back(25.9) == [3]
+    assert light.translate_brightness_back(25.9) == (3,)
 
 ###########################################################
 ### Other
@@ -575,6 +492,56 @@ def test_convert_percent_to_brightness(percent, brightness):
 
     assert _convert_percent_to_brightness(percent) == brightness
 
+def test_convert_percent_to_brightness_range():
+    """Test that every percent is converted to the lowest brightness that is not below it"""
+
+    def is_rounded_up(percent: int) -> bool:
+        brightness = _convert_percent_to_brightness(percent)
+        return brightness * 100 >= percent * 255 > (brightness - 1) * 100
+
+    assert [percent for percent in range(0, 101) if not is_rounded_up(percent)] == []
+
+async def test_async_setup_entry(hass: HomeAssistant):
+    """Test for config entry setup"""
+
+    # pylint: disable=protected-access
+
+    entry = MockConfigEntry(
+        domain="lightener",
+        unique_id=f"uid-{next(_ids)}",
+        data={
+            "friendly_name": "Test",
+            "entities": {
+                "light.test1": {"10": "100"},
+            },
+        },
+    )
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    # The v1 configuration must be migrated in the stored entry.
+    assert entry.version == 2
+    assert entry.data == {
+        "friendly_name": "Test",
+        "entities": {
+            "light.test1": {"brightness": {"10": "100"}},
+        },
+    }
+
+    platform = async_get_platforms(hass, "lightener")
+    light: LightenerLight = platform[0].entities["light.test"]
+
+    assert light.unique_id == entry.entry_id
+    assert hass.states.get("light.test") is not None
+    assert len(light._entities) == 1
+
+    controlled_light: LightenerControlledLight = light._entities[0]
+
+    assert controlled_light.entity_id == "light.test1"
+    assert controlled_light.levels[26] == 255
+
 async def test_async_setup_platform(hass):
     """Test for platform setup"""
 